@@ -5,7 +5,7 @@ from optimize.route_optimizer import optimize_routes
 from store.sqlite_writer import store_routes
 import structlog
 import os
-from config.settings import Settings
+from config.settings import Settings, set_log_level
 import io
 
 logger = structlog.get_logger()
@@ -31,7 +31,7 @@ def run_pipeline(
         numeric_level = getattr(logging, log_level.upper(), None)
         if not isinstance(numeric_level, int):
             raise ValueError(f"Invalid log level: {log_level}")
-        logging.getLogger('').setLevel(numeric_level if not verbose else logging.DEBUG)
+        set_log_level(numeric_level if not verbose else logging.DEBUG)
         logger.info("Starting pipeline", batch_size=batch_size, settings=settings.model_dump(), log_level=log_level, use_sample=use_sample)
         typer.echo(f"Starting logistics pipeline (batch_size={batch_size}, sample={use_sample})")  # NEW: CLI output
 
@@ -1,9 +1,11 @@
 from pydantic import BaseModel, field_validator, ValidationInfo
 from dotenv import load_dotenv
 import os
+import functools
 from pathlib import Path
 import structlog
 import logging
+import orjson
 
 load_dotenv(override=True)
 
@@ -59,22 +61,22 @@ class Settings(BaseModel):
             batch_size=int(os.getenv("BATCH_SIZE") or "50000")
         )
 
+default_settings = Settings.create()
+
 structlog.configure(
     processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.JSONRenderer(),
+        structlog.processors.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso", utc=True),
+        structlog.processors.EventRenamer("msg"),
+        structlog.processors.JSONRenderer(serializer=functools.partial(orjson.dumps, option=orjson.OPT_SERIALIZE_NUMPY)),
     ],
     context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
+    logger_factory=structlog.BytesLoggerFactory(file=open(default_settings.log_file, "ab", buffering=0)),
+    wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
     cache_logger_on_first_use=True,
 )
+logger = structlog.get_logger()
 
-default_settings = Settings.create()
-file_handler = logging.FileHandler(default_settings.log_file)
-file_handler.setFormatter(logging.Formatter('%(message)s'))
-logging.getLogger('').addHandler(file_handler)
-logging.getLogger('').setLevel(logging.DEBUG)
-logger = structlog.get_logger()
\ No newline at end of file
+def set_log_level(level: int) -> None:
+    """Set the minimum level emitted by structlog loggers (e.g. logging.DEBUG)."""
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(level))
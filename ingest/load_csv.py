@@ -3,16 +3,58 @@ from minio.error import S3Error
 from config.settings import Settings
 import structlog
 import io
+import time
+from functools import lru_cache
 from tenacity import retry, stop_after_attempt, wait_exponential
 from tqdm import tqdm
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 logger = structlog.get_logger()
 
+# Seconds a successful bucket_exists check is trusted before asking MinIO again
+BUCKET_CHECK_TTL = 60.0
+_bucket_checks: Dict[Tuple[int, str], float] = {}
+
 class IngestError(Exception):
     """Custom exception raised when CSV ingestion from MinIO fails."""
 
+@lru_cache(maxsize=4)
+def get_minio_client(endpoint: str, access_key: str, secret_key: str, secure: bool) -> Minio:
+    """Return a MinIO client for the given connection settings, reusing it across calls.
+
+    Args:
+        endpoint: MinIO server endpoint (host:port).
+        access_key: MinIO access key.
+        secret_key: MinIO secret key.
+        secure: Whether to connect over HTTPS.
+
+    Returns:
+        Cached MinIO client instance, so its pooled connections survive between loads.
+    """
+    return Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+
+def bucket_exists(client: Minio, bucket: str) -> bool:
+    """Check that a bucket exists, trusting a positive answer for BUCKET_CHECK_TTL seconds.
+
+    Args:
+        client: MinIO client instance.
+        bucket: MinIO bucket name.
+
+    Returns:
+        True if the bucket exists, False otherwise.
+    """
+    key = (id(client), bucket)
+    now = time.monotonic()
+    checked_at = _bucket_checks.get(key)
+    if checked_at is not None and now - checked_at < BUCKET_CHECK_TTL:
+        return True
+    if not client.bucket_exists(bucket):
+        _bucket_checks.pop(key, None)
+        return False
+    _bucket_checks[key] = now
+    return True
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10), reraise=True)
 def get_minio_object(client: Minio, bucket: str, name: str) -> io.BytesIO:
     """Fetch an object from MinIO with retries.
@@ -102,16 +144,16 @@ def load_csv(
     if not all(hasattr(settings, attr) for attr in required_attrs):
         raise ValueError(f"Settings object missing required attributes: {', '.join(attr for attr in required_attrs if not hasattr(settings, attr))}")
 
-    # Initialize MinIO client
-    client = Minio(
+    # Reuse the MinIO client for this configuration
+    client = get_minio_client(
         settings.minio_endpoint,
-        access_key=settings.minio_access_key,
-        secret_key=settings.minio_secret_key,
-        secure=settings.minio_secure
+        settings.minio_access_key,
+        settings.minio_secret_key,
+        settings.minio_secure
     )
 
     # Check bucket existence
-    if not client.bucket_exists(settings.minio_bucket):
+    if not bucket_exists(client, settings.minio_bucket):
         raise IngestError(f"Bucket '{settings.minio_bucket}' does not exist")
 
     try:
@@ -1,57 +1,72 @@
 import geopandas as gpd
-from shapely.geometry import Point
+import numpy as np
+from pyproj import Transformer
+from scipy.spatial import cKDTree
+from numba import njit, prange
 import duckdb
 import structlog
 import networkx as nx
 from tenacity import retry, stop_after_attempt, wait_exponential
 import pandas as pd
 import io
+import os
+import tempfile
 from multiprocessing import Pool, cpu_count
-from typing import List
+from typing import Iterator, List, Tuple
 
 logger = structlog.get_logger()
 
 class OptimizationError(Exception):
     """Custom exception raised when route optimization fails."""
 
-def validate_csv_schema(csv_data: io.StringIO) -> None:
-    """Validate that CSV data matches the expected schema."""
-    expected_columns = ["delivery_id", "pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon", "timestamp"]
-    try:
-        df = pd.read_csv(csv_data)
-    except pd.errors.EmptyDataError:
-        raise OptimizationError("CSV data is empty or lacks a header")
-    csv_data.seek(0)
-    if not all(col in df.columns for col in expected_columns):
-        raise OptimizationError(f"CSV schema mismatch: Expected {expected_columns}, found {df.columns.tolist()}")
-    if df['delivery_id'].duplicated().any():
-        raise OptimizationError("Duplicate delivery_id values found")
+EXPECTED_COLUMNS = ["delivery_id", "pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon", "timestamp"]
+COORDINATE_COLUMNS = ["pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon"]
+DUCKDB_INTEGER_TYPES = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT"}
+DUCKDB_NUMERIC_TYPES = DUCKDB_INTEGER_TYPES | {"FLOAT", "DOUBLE"}
 
-    required_numeric = ["pickup_lat", "pickup_lon", "dropoff_lat", "dropoff_lon"]
-    required_int = ["delivery_id"]
-    required_datetime = ["timestamp"]
+def validate_deliveries_table(conn: duckdb.DuckDBPyConnection) -> int:
+    """Validate the loaded deliveries table against the expected schema and value ranges.
 
-    for col in required_numeric:
-        if not pd.api.types.is_numeric_dtype(df[col]):
-            raise OptimizationError(f"Column {col} must be numeric, found {df[col].dtype}")
-        if df[col].isnull().any():
-            raise OptimizationError(f"Column {col} contains null values")
-        if col.endswith("lat") and not df[col].between(-90, 90).all():
-            raise OptimizationError(f"{col} out of valid latitude range (-90 to 90)")
-        if col.endswith("lon") and not df[col].between(-180, 180).all():
-            raise OptimizationError(f"{col} out of valid longitude range (-180 to 180)")
-
-    for col in required_int:
-        if not pd.api.types.is_integer_dtype(df[col]):
-            raise OptimizationError(f"Column {col} must be integer, found {df[col].dtype}")
-        if df[col].isnull().any():
-            raise OptimizationError(f"Column {col} contains null values")
+    Column types come from DESCRIBE; nulls, coordinate ranges, duplicate ids and
+    timestamp parsing are all checked with a single aggregate query.
+
+    Returns:
+        Number of rows in the deliveries table.
+    """
+    column_types = {name: col_type for name, col_type, *_ in conn.execute("DESCRIBE deliveries").fetchall()}
+    if not all(col in column_types for col in EXPECTED_COLUMNS):
+        found = [col for col in column_types if col != "rn"]
+        raise OptimizationError(f"CSV schema mismatch: Expected {EXPECTED_COLUMNS}, found {found}")
+
+    for col in COORDINATE_COLUMNS:
+        if column_types[col] not in DUCKDB_NUMERIC_TYPES and not column_types[col].startswith("DECIMAL"):
+            raise OptimizationError(f"Column {col} must be numeric, found {column_types[col]}")
+    if column_types["delivery_id"] not in DUCKDB_INTEGER_TYPES:
+        raise OptimizationError(f"Column delivery_id must be integer, found {column_types['delivery_id']}")
 
-    for col in required_datetime:
-        try:
-            pd.to_datetime(df[col], errors="raise")
-        except ValueError:
-            raise OptimizationError(f"Column {col} must be datetime, found invalid values")
+    null_counts = ", ".join(f"COUNT(*) - COUNT({col})" for col in COORDINATE_COLUMNS + ["delivery_id"])
+    ranges = ", ".join(f"MIN({col}), MAX({col})" for col in COORDINATE_COLUMNS)
+    row = conn.execute(f"""
+        SELECT COUNT(*), {null_counts}, {ranges},
+               COUNT(delivery_id) - COUNT(DISTINCT delivery_id),
+               COUNT(timestamp) - COUNT(TRY_CAST(timestamp AS TIMESTAMP))
+        FROM deliveries
+    """).fetchone()
+    total_rows, null_values, bounds, duplicate_ids, invalid_timestamps = row[0], row[1:6], row[6:14], row[14], row[15]
+
+    for col, nulls in zip(COORDINATE_COLUMNS + ["delivery_id"], null_values):
+        if nulls:
+            raise OptimizationError(f"Column {col} contains null values")
+    for col, low, high in zip(COORDINATE_COLUMNS, bounds[::2], bounds[1::2]):
+        limit = 90 if col.endswith("lat") else 180
+        if low is not None and (low < -limit or high > limit):
+            kind = "latitude" if col.endswith("lat") else "longitude"
+            raise OptimizationError(f"{col} out of valid {kind} range (-{limit} to {limit})")
+    if duplicate_ids:
+        raise OptimizationError("Duplicate delivery_id values found")
+    if invalid_timestamps:
+        raise OptimizationError("Column timestamp must be datetime, found invalid values")
+    return total_rows
 
 def get_utm_crs(lon: float, lat: float) -> str:
     """Determine UTM CRS based on longitude and latitude."""
@@ -66,21 +81,117 @@ def build_delivery_graph(batch_df: pd.DataFrame) -> nx.DiGraph:
         logger.error("Missing required columns in batch_df", missing=missing_cols)
         raise ValueError(f"batch_df missing required columns: {missing_cols}")
 
+    coords = batch_df[['pickup_lon', 'pickup_lat', 'dropoff_lon', 'dropoff_lat']].to_numpy()
+    pickup_geoms = gpd.points_from_xy(coords[:, 0], coords[:, 1])
+    dropoff_geoms = gpd.points_from_xy(coords[:, 2], coords[:, 3])
+    records = batch_df.to_dict('records')
+    pickup_ids = [f"p_{idx}" for idx in batch_df.index]
+    dropoff_ids = [f"d_{idx}" for idx in batch_df.index]
+
     G = nx.DiGraph()
-    for idx, row in batch_df.iterrows():
-        pickup_id = f"p_{idx}"
-        dropoff_id = f"d_{idx}"
-        pickup_data = row.to_dict()
-        dropoff_data = row.to_dict()
-        pickup_data['point_type'] = 'pickup'
-        pickup_data['geometry'] = Point(row['pickup_lon'], row['pickup_lat'])
-        dropoff_data['point_type'] = 'dropoff'
-        dropoff_data['geometry'] = Point(row['dropoff_lon'], row['dropoff_lat'])
-        G.add_node(pickup_id, **pickup_data)
-        G.add_node(dropoff_id, **dropoff_data)
-        G.add_edge(pickup_id, dropoff_id, weight=0)
+    G.add_nodes_from(zip(pickup_ids, [{**rec, 'point_type': 'pickup', 'geometry': geom} for rec, geom in zip(records, pickup_geoms)]))
+    G.add_nodes_from(zip(dropoff_ids, [{**rec, 'point_type': 'dropoff', 'geometry': geom} for rec, geom in zip(records, dropoff_geoms)]))
+    G.add_edges_from(zip(pickup_ids, dropoff_ids), weight=0)
     return G
 
+@njit(cache=True, fastmath=True)
+def greedy_tour(candidates: np.ndarray, pickups: np.ndarray, dropoffs: np.ndarray) -> np.ndarray:
+    """Walk the greedy tour over precomputed nearest-pickup candidates for each dropoff.
+
+    Falls back to a full scan of unvisited pickups when every candidate is taken.
+    """
+    n = pickups.shape[0]
+    visited = np.zeros(n, dtype=np.bool_)
+    order = np.empty(n, dtype=np.int64)
+    current = 0
+    for step in range(n):
+        order[step] = current
+        visited[current] = True
+        if step == n - 1:
+            break
+        nxt = -1
+        for candidate in candidates[current]:
+            if not visited[candidate]:
+                nxt = candidate
+                break
+        if nxt == -1:
+            best = np.inf
+            x, y = dropoffs[current, 0], dropoffs[current, 1]
+            for j in range(n):
+                if not visited[j]:
+                    dist = (pickups[j, 0] - x) ** 2 + (pickups[j, 1] - y) ** 2
+                    if dist < best:
+                        best = dist
+                        nxt = j
+        current = nxt
+    return order
+
+@njit(cache=True, fastmath=True)
+def _leg_length(pickups: np.ndarray, dropoffs: np.ndarray, a: int, b: int) -> float:
+    """Distance from the dropoff of delivery a to the pickup of delivery b."""
+    return np.sqrt((pickups[b, 0] - dropoffs[a, 0]) ** 2 + (pickups[b, 1] - dropoffs[a, 1]) ** 2)
+
+@njit(cache=True, parallel=True, fastmath=True)
+def two_opt(order: np.ndarray, pickups: np.ndarray, dropoffs: np.ndarray, window: int = 64, max_sweeps: int = 50) -> np.ndarray:
+    """Shorten a tour by reversing segments of up to `window` deliveries.
+
+    Legs run from one delivery's dropoff to the next delivery's pickup, so they are
+    asymmetric and the reversed segment's inner cost is accumulated alongside the
+    forward cost. Each sweep scores the best reversal for every start position in
+    parallel, then applies the improving ones that do not overlap. Stops after a
+    sweep with no improvement or after `max_sweeps`.
+    """
+    n = order.shape[0]
+    order = order.copy()
+    best_delta = np.zeros(n)
+    best_end = np.full(n, -1, dtype=np.int64)
+    for _ in range(max_sweeps):
+        for i in prange(n - 1):
+            best_delta[i] = -1e-9
+            best_end[i] = -1
+            forward = 0.0
+            reverse = 0.0
+            for j in range(i + 1, min(n, i + window)):
+                forward += _leg_length(pickups, dropoffs, order[j - 1], order[j])
+                reverse += _leg_length(pickups, dropoffs, order[j], order[j - 1])
+                delta = reverse - forward
+                if i > 0:
+                    delta += _leg_length(pickups, dropoffs, order[i - 1], order[j]) - _leg_length(pickups, dropoffs, order[i - 1], order[i])
+                if j < n - 1:
+                    delta += _leg_length(pickups, dropoffs, order[i], order[j + 1]) - _leg_length(pickups, dropoffs, order[j], order[j + 1])
+                if delta < best_delta[i]:
+                    best_delta[i] = delta
+                    best_end[i] = j
+
+        improved = False
+        last_end = -2
+        for i in range(n - 1):
+            # A reversal reads positions i-1..j+1, so skip moves touching an applied segment
+            if best_end[i] >= 0 and i >= last_end + 2:
+                order[i:best_end[i] + 1] = order[i:best_end[i] + 1][::-1].copy()
+                last_end = best_end[i]
+                improved = True
+        if not improved:
+            break
+    return order
+
+def greedy_route_order(pickups: np.ndarray, dropoffs: np.ndarray, k: int = 32) -> np.ndarray:
+    """Order deliveries greedily: after each dropoff, head to the nearest unvisited pickup.
+
+    Args:
+        pickups: (N, 2) array of projected pickup coordinates.
+        dropoffs: (N, 2) array of projected dropoff coordinates.
+        k: Number of nearest pickups to inspect before falling back to a full scan.
+
+    Returns:
+        Array of row positions in visit order, starting at the first delivery.
+    """
+    n = len(pickups)
+    k = min(k, n)
+    # k nearest pickups for every dropoff in one vectorised query, instead of a query per step
+    _, candidates = cKDTree(pickups).query(dropoffs, k=k)
+    return greedy_tour(candidates.reshape(n, k), pickups, dropoffs)
+
 def optimize_batch(batch_df: pd.DataFrame) -> gpd.GeoDataFrame:
     """Optimize delivery routes for a batch using a greedy nearest-neighbor approach."""
     if batch_df.empty:
@@ -89,47 +200,15 @@ def optimize_batch(batch_df: pd.DataFrame) -> gpd.GeoDataFrame:
     logger.debug("Optimizing batch with %d rows", len(batch_df))
     try:
         utm_crs = get_utm_crs(batch_df.iloc[0]['pickup_lon'], batch_df.iloc[0]['pickup_lat'])
-        G = build_delivery_graph(batch_df)
-
-        nodes_df = pd.DataFrame.from_dict(dict(G.nodes(data=True)), orient='index')
-        gdf = gpd.GeoDataFrame(nodes_df, geometry='geometry', crs="EPSG:4326").to_crs(utm_crs)
-
-        pickups_gdf = gdf[gdf.index.str.startswith('p_')]
-        dropoffs_gdf = gdf[gdf.index.str.startswith('d_')]
-        distances = pickups_gdf.geometry.apply(lambda p: dropoffs_gdf.geometry.distance(p))
-        for i, u in enumerate(pickups_gdf.index):
-            for j, v in enumerate(dropoffs_gdf.index):
-                if u[2:] != v[2:]:
-                    G.add_edge(u, v, weight=distances.iloc[i, j])
-
-        start_node = next(iter(pickups_gdf.index), None)
-        if not start_node:
-            raise OptimizationError("No pickup nodes in batch")
-
-        current_node = start_node
-        path = [current_node]
-        visited = {current_node}
-        while len(visited) < len(G.nodes()):
-            neighbors = [(n, G[current_node][n]['weight']) for n in G.neighbors(current_node) if n not in visited]
-            if not neighbors:
-                unvisited = [n for n in G.nodes() if n not in visited]
-                if unvisited:
-                    current_node = unvisited[0]
-                    path.append(current_node)
-                    visited.add(current_node)
-                else:
-                    break
-            else:
-                next_node = min(neighbors, key=lambda x: x[1])[0]
-                current_node = next_node
-                path.append(current_node)
-                visited.add(current_node)
-
-        path_data = [dict(G.nodes[node]) for node in path]
-        path_df = pd.DataFrame(path_data)
-        path_gdf = gpd.GeoDataFrame(path_df, geometry='geometry', crs="EPSG:4326")
-        optimized_route = path_gdf[path_gdf['point_type'] == 'pickup'].drop(columns=['point_type']).drop_duplicates(subset=['delivery_id'])
-        
+        transformer = Transformer.from_crs("EPSG:4326", utm_crs, always_xy=True)
+        pickups = np.column_stack(transformer.transform(batch_df['pickup_lon'].to_numpy(), batch_df['pickup_lat'].to_numpy()))
+        dropoffs = np.column_stack(transformer.transform(batch_df['dropoff_lon'].to_numpy(), batch_df['dropoff_lat'].to_numpy()))
+
+        order = two_opt(greedy_route_order(pickups, dropoffs), pickups, dropoffs)
+        path_df = batch_df.iloc[order].reset_index(drop=True)
+        path_gdf = gpd.GeoDataFrame(path_df, geometry=gpd.points_from_xy(path_df['pickup_lon'], path_df['pickup_lat']), crs="EPSG:4326")
+        optimized_route = path_gdf.drop_duplicates(subset=['delivery_id'])
+
         logger.info("Completed batch optimization", rows=len(optimized_route), batch_id=id(batch_df))
         return optimized_route
     except (IndexError, KeyError) as e:
@@ -139,6 +218,17 @@ def optimize_batch(batch_df: pd.DataFrame) -> gpd.GeoDataFrame:
         logger.error("Batch optimization failed", error=str(e), batch_id=id(batch_df))
         raise
 
+def _optimize_numbered_batch(numbered_batch: Tuple[int, pd.DataFrame]) -> Tuple[int, gpd.GeoDataFrame]:
+    """Optimize a (batch_id, batch_df) pair, keeping the id so results can be reordered."""
+    batch_id, batch_df = numbered_batch
+    return batch_id, optimize_batch(batch_df)
+
+def batch_generator(conn: duckdb.DuckDBPyConnection, batch_size: int) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """Lazily yield numbered batches of the deliveries table as DataFrames, in row order."""
+    reader = conn.execute("SELECT * EXCLUDE (rn) FROM deliveries ORDER BY rn").fetch_record_batch(batch_size)
+    for batch_id, record_batch in enumerate(reader):
+        yield batch_id, record_batch.to_pandas(self_destruct=True)
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10), reraise=True)
 def optimize_routes(csv_data_list: List[io.StringIO], batch_size: int = 100) -> gpd.GeoDataFrame:
     """Optimize delivery routes across multiple CSV files using batch processing
@@ -159,33 +249,29 @@ def optimize_routes(csv_data_list: List[io.StringIO], batch_size: int = 100) ->
 
     try:
         with duckdb.connect() as conn:
-            logger.debug("Validating CSV schemas", count=len(csv_data_list))
-            for i, csv_data in enumerate(csv_data_list):
-                csv_data.seek(0)
-                validate_csv_schema(csv_data)
-
             logger.debug("Loading CSVs into DuckDB")
-            for i, csv_data in enumerate(csv_data_list):
-                csv_data.seek(0)
-                df = pd.read_csv(csv_data)
-                conn.register(f"deliveries_{i}", df)
-                conn.execute(f"CREATE OR REPLACE TABLE deliveries_{i} AS SELECT * FROM deliveries_{i}")
-
-            logger.debug("Combining deliveries tables")
-            conn.execute("CREATE TABLE deliveries AS " + " UNION ALL ".join(f"SELECT * FROM deliveries_{i}" for i in range(len(csv_data_list))))
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                csv_paths = []
+                for i, csv_data in enumerate(csv_data_list):
+                    data = csv_data.getvalue()
+                    if not data or data.isspace():
+                        raise OptimizationError("CSV data is empty or lacks a header")
+                    csv_path = os.path.join(tmp_dir, f"deliveries_{i}.csv")
+                    with open(csv_path, "w", encoding="utf-8") as f:
+                        f.write(data)
+                    csv_paths.append(csv_path)
+                conn.execute("CREATE TABLE deliveries AS SELECT *, row_number() OVER () AS rn FROM read_csv_auto(?, union_by_name=true)", [csv_paths])
 
-            total_rows = conn.execute("SELECT COUNT(*) FROM deliveries").fetchone()[0]
+            logger.debug("Validating deliveries table")
+            total_rows = validate_deliveries_table(conn)
             batches = (total_rows + batch_size - 1) // batch_size
             logger.info("Starting route optimization", total_rows=total_rows, batches=batches)
 
-            optimized_dfs = []
+            optimized_dfs = [None] * batches
             with Pool(processes=max(1, cpu_count() - 1)) as pool:
-                offsets = [batch_num * batch_size for batch_num in range(batches)]
-                batch_queries = [f"SELECT * FROM deliveries LIMIT {batch_size} OFFSET {offset}" for offset in offsets]
-                batch_dfs = [conn.execute(query).fetch_df() for query in batch_queries]
-                logger.debug("Starting parallel optimization", batch_count=len(batch_dfs))
-                results = pool.map(optimize_batch, batch_dfs)
-                optimized_dfs.extend(results)
+                logger.debug("Starting parallel optimization", batch_count=batches)
+                for batch_id, result in pool.imap_unordered(_optimize_numbered_batch, batch_generator(conn, batch_size), chunksize=4):
+                    optimized_dfs[batch_id] = result
 
             logger.debug("Concatenating optimized batches")
             optimized = pd.concat(optimized_dfs, ignore_index=True)
@@ -22,11 +22,11 @@ def settings():
         map_output_dir="visualize/maps"
     )
 
-def test_convert_tlc_to_csv_success(settings, caplog):
+def test_convert_tlc_to_csv_success(settings):
     """Test successful conversion and upload."""
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", category=pd.errors.SettingWithCopyWarning)
-        with caplog.at_level("INFO"):
+        with patch("scripts.convert_tlc_to_csv.logger") as mock_logger:
             # Mock Path
             with patch("scripts.convert_tlc_to_csv.Path") as mock_path:
                 mock_path.return_value.is_file.return_value = True
@@ -55,8 +55,9 @@ def test_convert_tlc_to_csv_success(settings, caplog):
                              patch("scripts.convert_tlc_to_csv.Settings.create", return_value=settings):
                             convert_tlc_to_csv(input_file="test.parquet", shapefile_dir="test_shapefile", max_rows=2, sample_rows=1)
                             assert mock_minio.put_object.call_count == 2
-                            assert "Uploaded full dataset" in caplog.text
-                            assert "Uploaded sample" in caplog.text
+                            events = [call.args[0] for call in mock_logger.info.call_args_list]
+                            assert "Uploaded full dataset" in events
+                            assert "Uploaded sample" in events
 
 def test_convert_tlc_to_csv_file_not_found():
     """Test failure when input file is not found."""
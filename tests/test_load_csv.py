@@ -1,7 +1,7 @@
 import io
 import pytest
 from unittest.mock import patch, Mock
-from ingest.load_csv import load_csv, IngestError
+from ingest.load_csv import load_csv, IngestError, get_minio_client, _bucket_checks
 from config.settings import Settings
 
 @pytest.fixture
@@ -19,6 +19,15 @@ def settings():
         batch_size=100000
     )
 
+@pytest.fixture(autouse=True)
+def clear_minio_caches():
+    """Fixture to drop cached MinIO clients and bucket checks between tests."""
+    get_minio_client.cache_clear()
+    _bucket_checks.clear()
+    yield
+    get_minio_client.cache_clear()
+    _bucket_checks.clear()
+
 def test_load_csv_success(settings):
     """Test successful CSV ingestion."""
     class MockMinio:
@@ -158,4 +167,33 @@ def test_load_csv_bucket_not_found(settings):
 
     with patch('ingest.load_csv.Minio', MockMinioNoBucket), patch('ingest.load_csv.tqdm', lambda x, *_, **__: x):
         with pytest.raises(IngestError, match="Bucket 'test-bucket' does not exist"):
-            load_csv(settings)
\ No newline at end of file
+            load_csv(settings)
+
+def test_load_csv_reuses_client(settings):
+    """Test that repeated loads share one MinIO client and bucket check."""
+    class MockMinioCounting:
+        instances = 0
+        bucket_checks = 0
+
+        def __init__(self, *args, **kwargs):
+            MockMinioCounting.instances += 1
+
+        def bucket_exists(self, bucket_name):
+            MockMinioCounting.bucket_checks += 1
+            return True
+
+        def list_objects(self, bucket_name, prefix='', recursive=True):
+            return [Mock(object_name="raw/deliveries.csv", size=1000)]
+
+        def get_object(self, bucket_name, object_name):
+            data = io.StringIO(
+                "delivery_id,pickup_lat,pickup_lon,dropoff_lat,dropoff_lon,timestamp\n"
+                "1,40.7128,-74.0060,40.7140,-74.0070,2025-02-20 10:00:00\n"
+            )
+            return Mock(read=lambda: data.getvalue().encode("utf-8"), close=lambda: None, release_conn=lambda: None)
+
+    with patch('ingest.load_csv.Minio', MockMinioCounting), patch('ingest.load_csv.tqdm', lambda x, *_, **__: x):
+        load_csv(settings)
+        load_csv(settings)
+        assert MockMinioCounting.instances == 1
+        assert MockMinioCounting.bucket_checks == 1
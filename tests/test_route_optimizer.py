@@ -1,7 +1,7 @@
 import io
 import pandas as pd
 import numpy as np
-from optimize.route_optimizer import optimize_routes, OptimizationError, optimize_batch
+from optimize.route_optimizer import optimize_routes, OptimizationError, optimize_batch, greedy_route_order
 import pytest
 import geopandas as gpd
 
@@ -55,6 +55,15 @@ def test_optimize_batch_directly():
     # Check geometry is valid and matches expected coordinates
     assert not result.geometry.is_empty.any()
 
+def test_greedy_route_order_chains_nearest_pickup():
+    """Each dropoff should be followed by the closest unvisited pickup."""
+    pickups = np.array([[0.0, 0.0], [100.0, 0.0], [10.0, 0.0]])
+    dropoffs = np.array([[9.0, 0.0], [50.0, 0.0], [90.0, 0.0]])
+
+    order = greedy_route_order(pickups, dropoffs)
+
+    assert order.tolist() == [0, 2, 1]
+
 def test_invalid_schema():
     invalid_data = io.StringIO("id,lat,lon,time\n1,40.7128,-74.0060,2025-02-20")
     with pytest.raises(OptimizationError, match="CSV schema mismatch"):
@@ -71,6 +80,13 @@ def test_numeric_validation():
     with pytest.raises(OptimizationError, match="must be numeric"):
         optimize_routes([invalid_numeric], batch_size=10)
 
+def test_duplicate_delivery_ids():
+    duplicate_ids = io.StringIO("""delivery_id,pickup_lat,pickup_lon,dropoff_lat,dropoff_lon,timestamp
+1,40.7128,-74.0060,40.7140,-74.0070,2025-02-20 10:00:00
+1,40.7130,-74.0050,40.7150,-74.0060,2025-02-20 10:05:00""")
+    with pytest.raises(OptimizationError, match="Duplicate delivery_id"):
+        optimize_routes([duplicate_ids], batch_size=10)
+
 def test_multiple_csv_files():
     data1 = io.StringIO("""delivery_id,pickup_lat,pickup_lon,dropoff_lat,dropoff_lon,timestamp
 1,40.7128,-74.0060,40.7140,-74.0070,2025-02-20 10:00:00""")